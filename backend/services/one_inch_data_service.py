@@ -4,6 +4,8 @@ import os
 import time
 import httpx
 import asyncio
+import email.utils
+import orjson
 from typing import Optional, List, Dict, Any
 from async_lru import alru_cache
 
@@ -100,6 +102,9 @@ GRANULARITY_MAP_PORTFOLIO_V2 = {
     "month": "month"
 }
 
+# Portfolio API v2 granularity key for each candle period, in seconds
+PERIOD_TO_GRANULARITY = {3600: "hour", 14400: "hour4", PERIOD_DAILY_SECONDS: "day"}
+
 class OneInchAPIError(Exception):
     """Custom exception for 1inch API errors."""
     def __init__(self, message, status_code=None, response_text=None, url_requested=None):
@@ -107,10 +112,44 @@ class OneInchAPIError(Exception):
         self.status_code = status_code
         self.response_text = response_text
         self.url_requested = url_requested
+        # Parse the 1inch error body once so callers can match on fields instead of rescanning the text
+        self.error_code = None
+        self.description = None
+        if response_text:
+            try:
+                body = orjson.loads(response_text)
+            except ValueError:
+                body = None
+            if isinstance(body, dict):
+                self.error_code = body.get("statusCode")
+                self.description = body.get("description")
 
     def __str__(self):
         return f"{super().__str__()} (Status: {self.status_code}, URL: {self.url_requested}, Response: {self.response_text[:500] if self.response_text else 'N/A'})"
 
+# --- Retry Configuration ---
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}  # Transient responses worth retrying
+MAX_RETRIES = 3
+RETRY_BACKOFF_FACTOR = 0.25  # Sleeps 0.25s, 0.5s, 1s between attempts unless the API sends Retry-After
+# Most backoff one call may add to the API handler awaiting it; a longer wait (e.g. a Retry-After of several
+# seconds) fails fast with the last response instead of holding the request open
+RETRY_MAX_TOTAL_DELAY_SECONDS = 2.0
+
+def retry_delay_seconds(response: httpx.Response, attempt: int) -> float:
+    """
+    Seconds to wait before retrying `response`: the server's Retry-After (delta-seconds or an HTTP date) when it
+    sends one, exponential backoff for the 0-based `attempt` otherwise.
+    """
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            retry_at = email.utils.parsedate_tz(retry_after)
+            if retry_at is not None:
+                return max(0.0, email.utils.mktime_tz(retry_at) - time.time())
+    return RETRY_BACKOFF_FACTOR * (2 ** attempt)
+
 # --- Global httpx.AsyncClient instance for connection pooling ---
 _async_http_client: Optional[httpx.AsyncClient] = None
 
@@ -118,7 +157,16 @@ async def get_http_client() -> httpx.AsyncClient:
     """Provides a global httpx.AsyncClient instance, creating it if necessary."""
     global _async_http_client
     if _async_http_client is None or _async_http_client.is_closed:
-        _async_http_client = httpx.AsyncClient(timeout=30) # Default timeout
+        # HTTP/2 lets concurrent screener requests multiplex over one TLS connection to api.1inch.dev.
+        # Limits and http2 must be set on the transport itself, the client ignores them once a transport is given.
+        _async_http_client = httpx.AsyncClient(
+            timeout=30, # Default timeout
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+                retries=MAX_RETRIES # Retries failed connection attempts
+            )
+        )
     return _async_http_client
 
 async def close_http_client():
@@ -139,15 +187,31 @@ async def _make_1inch_api_request(url: str, params: dict = None, api_description
     client = await get_http_client()
 
     try:
-        response = await client.get(url, headers=headers, params=params)
-        logger.debug(f"Request URL: {response.url}")
-        logger.debug(f"Request headers: {headers}")
-        logger.debug(f"Response status code: {response.status_code}")
-        logger.debug(f"Response raw text (first 500 chars): {response.text[:500]}")
+        # Retry transient status codes within the delay budget; other errors surface immediately
+        total_delay = 0.0
+        for attempt in range(MAX_RETRIES + 1):
+            response = await client.get(url, headers=headers, params=params)
+            if response.status_code not in RETRY_STATUS_CODES or attempt == MAX_RETRIES:
+                break
+            retry_delay = retry_delay_seconds(response, attempt)
+            if total_delay + retry_delay > RETRY_MAX_TOTAL_DELAY_SECONDS:
+                logger.warning(f"{api_description} returned status {response.status_code}. Not retrying: waiting {retry_delay:g}s would exceed the {RETRY_MAX_TOTAL_DELAY_SECONDS:g}s retry budget.")
+                break
+            total_delay += retry_delay
+            logger.warning(f"{api_description} returned status {response.status_code}. Retrying in {retry_delay:g}s (attempt {attempt + 1}/{MAX_RETRIES}).")
+            await asyncio.sleep(retry_delay)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            # Guarded so the body is only decoded to text when debug logging is actually on
+            logger.debug(f"Request URL: {response.url}")
+            logger.debug(f"Request headers: {headers}")
+            logger.debug(f"Response status code: {response.status_code}")
+            logger.debug(f"Response raw text (first 500 chars): {response.text[:500]}")
         
         response.raise_for_status()
         
-        json_response = response.json()
+        # orjson parses the raw bytes directly, skipping the str decode that response.json() does
+        json_response = orjson.loads(response.content)
         logger.info(f"Successfully fetched data async from {api_description} for URL: {url}.")
         return json_response
         
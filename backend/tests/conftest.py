@@ -0,0 +1,88 @@
+import logging
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from backend.tests.oneinch_client import (
+    API_BURST_REQUESTS,
+    CASSETTE_DIR,
+    OneInchHTTP,
+    TokenBucketRateLimiter,
+    build_response_cache,
+    cache_mode_for,
+    worker_requests_per_second
+)
+
+logger = logging.getLogger(__name__)
+
+# Shared example key; rate-limited, so set ONE_INCH_API_KEY for real runs
+ONE_INCH_EXAMPLE_API_KEY = "PrA0uavUMpVOig4aopY0MQMqti3gO19d"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--no-cache",
+        action="store_true",
+        default=False,
+        help="Bypass the on-disk 1inch HTTP response cache and always call the live API."
+    )
+    parser.addoption(
+        "--replay",
+        action="store_true",
+        default=False,
+        help="Serve the network tests' 1inch API calls only from the recorded cassettes in tests/cassettes, without "
+             "touching the network."
+    )
+    parser.addoption(
+        "--live",
+        action="store_true",
+        default=False,
+        help="Call the live 1inch API and re-record the cassettes in tests/cassettes for the requests made in this run; "
+             "recordings of other requests are kept."
+    )
+
+
+def pytest_configure(config):
+    # One BLAS/OpenMP thread per pytest-xdist worker: the workers already spread the test cases over the cores, so
+    # nested threading would only oversubscribe them. Single-process runs keep BLAS's own threading. This runs before
+    # any test module is imported, i.e. before numpy loads and reads these; values already set in the environment win.
+    if "PYTEST_XDIST_WORKER" in os.environ and "numpy" not in sys.modules:
+        for thread_env_var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+            os.environ.setdefault(thread_env_var, "1")
+    cache_flags = [flag for flag in ("--no-cache", "--replay", "--live") if config.getoption(flag)]
+    if len(cache_flags) > 1:
+        raise pytest.UsageError(f"{' and '.join(cache_flags)} are mutually exclusive; pass at most one of them.")
+    config.addinivalue_line("markers", "network: test calls the live 1inch API (deselect with -m 'not network')")
+    config.addinivalue_line("markers", "serial: test paces its own API usage and must not run under pytest-xdist (deselect with -m 'not serial')")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """pytest-xdist controller hook: pass the --dist mode to workers, where xdist resets it to 'no'."""
+    node.workerinput["dist"] = node.config.getoption("dist")
+
+
+@pytest.fixture(scope="session")
+def oneinch_cfg():
+    """1inch API settings, resolved once per session so the example-key warning is logged once rather than per module."""
+    key = os.getenv("ONE_INCH_API_KEY") or ONE_INCH_EXAMPLE_API_KEY
+    if key == ONE_INCH_EXAMPLE_API_KEY:
+        logger.warning("Using default/example 1inch API Key. Consider setting ONE_INCH_API_KEY environment variable for full access.")
+    return SimpleNamespace(
+        key=key,
+        auth_headers={"Authorization": f"Bearer {key}"}
+    )
+
+
+@pytest.fixture(scope="session")
+def oneinch_http(request, oneinch_cfg):
+    """1inch HTTP setup shared by the whole run, so every API call goes through one rate limiter and cache."""
+    cache_mode = cache_mode_for(request.config)
+    if cache_mode == "replay" and not any(CASSETTE_DIR.glob("*.json")):
+        pytest.skip(f"--replay: no recorded 1inch responses in {CASSETTE_DIR}; record them once with --live")
+    requests_per_second = worker_requests_per_second(request.config)
+    logger.debug(f"Rate limiting 1inch API calls to {requests_per_second:g} requests/second in this process.")
+    rate_limiter = TokenBucketRateLimiter(requests_per_second, burst=API_BURST_REQUESTS)
+    return OneInchHTTP(oneinch_cfg.auth_headers, rate_limiter, build_response_cache(cache_mode))
@@ -0,0 +1,80 @@
+"""
+Numba-compiled loops shared by the test modules.
+
+They are compiled with cache=True, so only the first run on a machine pays for the JIT. Numba's on-disk cache
+records the name of the module a kernel was compiled in and re-imports it by that name on load, which breaks
+for a test module that is imported both by pytest (backend.tests.test_x) and as a script (__main__). Keeping
+the kernels here, always imported as backend.tests.numba_kernels, gives them one stable module name.
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def volatility_path(vol_innovations: np.ndarray, regime_mask: np.ndarray, regime_multipliers: np.ndarray, initial_vol: float = 0.02) -> np.ndarray:
+    """
+    Sequential AR(1) volatility recurrence with clipping and regime spikes, for the GARCH test data generator.
+    This is the only part of the generator that cannot be vectorized.
+    """
+    n_periods = len(vol_innovations)
+    vol_path = np.empty(n_periods, dtype=vol_innovations.dtype)
+    current_vol = initial_vol
+    for i in range(n_periods):
+        # Volatility clustering: current volatility depends on previous volatility
+        if i > 0:
+            current_vol = 0.9 * current_vol + vol_innovations[i]
+            current_vol = max(0.005, min(0.1, current_vol))  # Bound between 0.5% and 10%
+        # Regime changes (sudden volatility spikes)
+        if regime_mask[i]:
+            current_vol *= regime_multipliers[i]
+        vol_path[i] = current_vol
+    return vol_path
+
+
+@njit(cache=True)
+def clustered_returns(initial_vol: float, vol_shocks_sq: np.ndarray, innovations: np.ndarray) -> np.ndarray:
+    """Returns with a GARCH-like volatility recurrence, for the forecast accuracy tests' GARCH fit."""
+    out = np.empty(len(innovations))
+    vol = initial_vol
+    for i in range(len(innovations)):
+        vol = 0.8 * vol + 0.2 * 0.02 + 0.1 * vol * vol_shocks_sq[i]
+        out[i] = vol * innovations[i]
+    return out
+
+
+# Per-candle sanity checks, indexed by the check code first_bad_candle returns
+CANDLE_CHECK_MESSAGES = (
+    "has NaN values for {}",
+    "H<L for {}",
+    "H<O for {}",
+    "H<C for {}",
+    "L>O for {}",
+    "L>C for {}",
+    "time too small for {}",
+)
+
+
+@njit(cache=True)
+def first_bad_candle(candles: np.ndarray):
+    """
+    Single pass over the (time, open, high, low, close) rows of a 1inch OHLCV response, stopping at the first failure.
+    Returns (row, check code) or (-1, -1) if every candle is sane.
+    """
+    for i in range(candles.shape[0]):
+        c_time, c_open, c_high, c_low, c_close = candles[i, 0], candles[i, 1], candles[i, 2], candles[i, 3], candles[i, 4]
+        if np.isnan(c_time) or np.isnan(c_open) or np.isnan(c_high) or np.isnan(c_low) or np.isnan(c_close):
+            return i, 0
+        if c_high < c_low:
+            return i, 1
+        if c_high < c_open:
+            return i, 2
+        if c_high < c_close:
+            return i, 3
+        if c_low > c_open:
+            return i, 4
+        if c_low > c_close:
+            return i, 5
+        if c_time <= 1_000_000_000:
+            return i, 6
+    return -1, -1
@@ -0,0 +1,281 @@
+"""
+1inch HTTP plumbing shared by the network tests: the per-key rate limiter, the on-disk response cache behind
+--no-cache/--replay/--live, and the httpx client every 1inch call of a test goes through. conftest.py builds one
+OneInchHTTP per session and hands it out as the oneinch_http fixture.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+import orjson
+import pytest
+
+from backend.services import one_inch_data_service
+from backend.services.one_inch_data_service import (
+    MAX_RETRIES,
+    RETRY_STATUS_CODES,
+    RETRY_MAX_TOTAL_DELAY_SECONDS,
+    retry_delay_seconds
+)
+
+logger = logging.getLogger(__name__)
+
+
+# --- API rate limiting ---
+# 1inch allows ~5 requests/second per API key
+API_REQUESTS_PER_SECOND = 5
+API_BURST_REQUESTS = 5
+
+
+def module_on_one_process(config) -> bool:
+    """
+    Whether this process runs all of a test module's selected tests: always without xdist, and with --dist=loadfile
+    or loadscope, which keep each module on one worker. Other distributions spread its tests over every worker.
+    """
+    workerinput = getattr(config, "workerinput", None)  # Only set on xdist workers; conftest adds the dist mode
+    return workerinput is None or workerinput.get("dist") in ("loadfile", "loadscope")
+
+
+def worker_requests_per_second(config) -> float:
+    """This process's share of the key's budget: all of it if a module runs here alone, else an even split."""
+    if module_on_one_process(config):
+        return API_REQUESTS_PER_SECOND
+    return API_REQUESTS_PER_SECOND / config.workerinput["workercount"]
+
+
+class TokenBucketRateLimiter:
+    """
+    Token bucket: callers only wait when the bucket is empty. Each acquire reserves a slot under a thread lock and
+    sleeps outside it, so one limiter paces every event loop of the session (each asyncio.run gets a fresh loop).
+    """
+
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        self._rate = rate_per_second
+        self._capacity = float(burst)
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Takes a token, going into debt if the bucket is empty; returns how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._last_refill) * self._rate) - 1
+            self._last_refill = now
+            return max(0.0, -self._tokens / self._rate)
+
+    async def acquire(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# --- Response cache ---
+# Successful GETs are cached on disk, so reruns replay responses instead of spending rate-limit quota.
+# TTLs follow how volatile each resource is: live charts expire quickly, portfolio price ranges a bit later,
+# anything else (e.g. token lists) after an hour. Run pytest with --no-cache to always hit the API.
+HTTP_CACHE_PATH = Path.home() / ".cache" / "eth_global_prague" / "1inch_http_cache"
+HTTP_CACHE_EXPIRE_SECONDS = 3600
+HTTP_CACHE_EXPIRE_BY_URL = {
+    "api.1inch.dev/charts/": 60,
+    "api.1inch.dev/portfolio/": 300,
+    "api.1inch.dev/token/": 3600,
+}
+
+CASSETTE_DIR = Path(__file__).resolve().parent / "cassettes" / "1inch"
+
+# Left out of the cache key: the service and the cross-prices cases ask for a window ending now, so keying on it
+# would make every recording stale within the hour
+CACHE_KEY_IGNORED_PARAMS = ("from_timestamp", "to_timestamp")
+
+
+class ResponseCache:
+    """
+    Successful GET responses, one JSON file each under `directory`, named by a hash of the request URL without
+    its CACHE_KEY_IGNORED_PARAMS.
+    Only the URL, status, content type and body are stored; request headers (and so the API key) never are.
+    `read`/`write` select whether entries are served and whether fresh responses are stored; `only_if_cached`
+    turns a miss into a 504 instead of a network call. `expire_after` (seconds, None for never) is overridden by
+    the first `urls_expire_after` prefix matching the URL's host and path.
+    """
+
+    def __init__(self, directory: Path, read: bool = True, write: bool = True, only_if_cached: bool = False,
+                 expire_after: Optional[int] = None, urls_expire_after: Optional[dict] = None):
+        self.directory = directory
+        self.read = read
+        self.write = write
+        self.only_if_cached = only_if_cached
+        self._expire_after = expire_after
+        self._urls_expire_after = urls_expire_after or {}
+
+    def _path(self, request: httpx.Request) -> Path:
+        url = request.url
+        for param in CACHE_KEY_IGNORED_PARAMS:
+            url = url.copy_remove_param(param)
+        digest = hashlib.blake2b(f"{request.method} {url}".encode(), digest_size=16).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def _ttl(self, url: httpx.URL) -> Optional[int]:
+        host_and_path = f"{url.host}{url.path}"
+        for prefix, ttl in self._urls_expire_after.items():
+            if host_and_path.startswith(prefix):
+                return ttl
+        return self._expire_after
+
+    def load(self, request: httpx.Request) -> Optional[httpx.Response]:
+        if not self.read:
+            return None
+        path = self._path(request)
+        ttl = self._ttl(request.url)
+        try:
+            if ttl is not None and time.time() - path.stat().st_mtime >= ttl:
+                return None
+            entry = orjson.loads(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+        return httpx.Response(
+            entry["status"],
+            headers={"Content-Type": entry["content_type"]},
+            content=entry["body"].encode(),
+            request=request,
+            extensions={"from_cache": True}
+        )
+
+    def store(self, request: httpx.Request, response: httpx.Response) -> None:
+        if not self.write or response.status_code != 200:
+            return
+        path = self._path(request)
+        entry = {
+            "url": str(request.url),
+            "status": response.status_code,
+            "content_type": response.headers.get("Content-Type", "application/json"),
+            "body": response.text
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename, so concurrent xdist workers never read a half-written entry
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(orjson.dumps(entry, option=orjson.OPT_INDENT_2))
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Could not write cached response {path}: {e}")
+
+
+def cache_mode_for(config) -> str:
+    """
+    Resolves the command-line flags to one of 'replay', 'record', 'off' or 'ttl' (the default local cache).
+    conftest.py rejects combinations of them, so at most one is set.
+    """
+    if config.getoption("--replay"):
+        return "replay"
+    if config.getoption("--live"):
+        return "record"
+    return "off" if config.getoption("--no-cache") else "ttl"
+
+
+def build_response_cache(cache_mode: str) -> Optional[ResponseCache]:
+    """
+    The response cache for cache_mode: the expiring local cache ('ttl'), the recorded cassettes only ('replay'),
+    the network while re-recording the cassettes ('record'), or none at all ('off').
+    """
+    if cache_mode == "off":
+        return None
+    if cache_mode == "ttl":
+        return ResponseCache(HTTP_CACHE_PATH, expire_after=HTTP_CACHE_EXPIRE_SECONDS, urls_expire_after=HTTP_CACHE_EXPIRE_BY_URL)
+    # Cassettes are kept until re-recorded; --live overwrites only the recordings of the requests it makes
+    if cache_mode == "replay":
+        return ResponseCache(CASSETTE_DIR, write=False, only_if_cached=True)
+    return ResponseCache(CASSETTE_DIR, read=False)
+
+
+# --- Shared HTTP client ---
+class OneInchTransport(httpx.AsyncBaseTransport):
+    """
+    Transport under every 1inch call made in a test, the tests' own and the service's: serves GETs from the
+    response cache when it can, otherwise takes a rate-limit token per attempt and sends the request over one
+    HTTP/2 connection, so concurrent calls multiplex as streams instead of each holding a socket.
+    Transient statuses are retried here, honoring Retry-After within the service's delay budget; this is the only
+    retry layer, as OneInchHTTP.run turns the service's own loop off. Auth headers are set here, so the
+    service's own key lookup doesn't matter.
+    """
+
+    def __init__(self, rate_limiter: TokenBucketRateLimiter, auth_headers: dict, cache: Optional[ResponseCache]):
+        self._rate_limiter = rate_limiter
+        self._auth_headers = auth_headers
+        self._cache = cache
+        self._transport = httpx.AsyncHTTPTransport(http2=True, retries=3)  # Retries failed connection attempts
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request.headers.update(self._auth_headers)
+        cache = self._cache if request.method == "GET" else None
+        if cache is not None:
+            cached = cache.load(request)
+            if cached is not None:
+                return cached
+            if cache.only_if_cached:
+                return httpx.Response(504, json={"description": f"Not recorded in {cache.directory}; record it with --live"}, request=request)
+        response = await self._send(request)
+        if cache is not None:
+            await response.aread()
+            cache.store(request, response)
+        return response
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        total_delay = 0.0
+        for attempt in range(MAX_RETRIES + 1):
+            await self._rate_limiter.acquire()
+            response = await self._transport.handle_async_request(request)
+            if response.status_code not in RETRY_STATUS_CODES or attempt == MAX_RETRIES:
+                return response
+            retry_delay = retry_delay_seconds(response, attempt)
+            if total_delay + retry_delay > RETRY_MAX_TOTAL_DELAY_SECONDS:
+                logger.debug(f"Not retrying {request.url}: waiting {retry_delay:g}s would exceed the retry budget.")
+                return response
+            total_delay += retry_delay
+            await response.aclose()
+            logger.debug(f"Retrying {request.url} in {retry_delay:g}s after HTTP {response.status_code}.")
+            await asyncio.sleep(retry_delay)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class OneInchHTTP:
+    """
+    The session's 1inch HTTP setup: auth headers, rate limiter and response cache. Clients are made per event loop,
+    since an HTTP/2 connection pool can't outlive the loop it was opened in.
+    """
+
+    def __init__(self, auth_headers: dict, rate_limiter: TokenBucketRateLimiter, cache: Optional[ResponseCache]):
+        self.auth_headers = auth_headers
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+
+    def run(self, main):
+        """
+        Runs the coroutine function `main(client)` in a new event loop and returns its result. The 1inch service's
+        shared client is swapped for `client` meanwhile, so service calls share its rate limiter and cache, and the
+        service's retry loop is turned off, since the client's transport already retries.
+        """
+        async def run():
+            client = httpx.AsyncClient(
+                transport=OneInchTransport(self.rate_limiter, self.auth_headers, self.cache),
+                headers={"Accept": "application/json"},  # httpx adds Accept-Encoding for every decoder installed (br with brotli)
+                timeout=30
+            )
+            try:
+                with pytest.MonkeyPatch.context() as mp:
+                    mp.setattr(one_inch_data_service, "_async_http_client", client)
+                    mp.setattr(one_inch_data_service, "MAX_RETRIES", 0)
+                    return await main(client)
+            finally:
+                await client.aclose()
+
+        return asyncio.run(run())
@@ -4,6 +4,8 @@ Comprehensive test script to validate the accuracy of TA and Quant forecast modu
 Tests for calculation correctness, edge cases, and numerical stability.
 """
 
+import functools
+import pytest
 import pandas as pd
 import numpy as np
 import logging
@@ -14,6 +16,8 @@ import warnings
 
 # Add the backend directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__)))
+# The repository root, so the Numba kernels load under their package name when run as a script too
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 # Import the forecast modules
 from forecast.ta_forecast import generate_ta_signals, convert_numpy_types
@@ -28,6 +32,7 @@ from forecast.quant_forecast import (
     generate_fourier_signals_analysis,
     FourierSignalConfig
 )
+from backend.tests.numba_kernels import clustered_returns
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -36,76 +41,64 @@ logger = logging.getLogger(__name__)
 # Suppress warnings for cleaner output
 warnings.filterwarnings('ignore')
 
-def create_test_ohlcv_data(n_periods: int = 200, price_start: float = 100.0, add_trend: bool = True) -> pd.DataFrame:
-    """Create synthetic OHLCV data for testing."""
-    np.random.seed(42)  # For reproducible results
-    
-    # Ensure we have at least 50 periods for proper testing
-    n_periods = max(n_periods, 50)
-    
-    timestamps = [1640995200 + i * 86400 for i in range(n_periods)]  # Daily timestamps starting Jan 1, 2022
-    
-    # Generate price series with trend and volatility
-    returns = np.random.normal(0.001 if add_trend else 0, 0.02, n_periods)  # 2% daily volatility
-    prices = [price_start]
-    
-    for ret in returns[1:]:
-        prices.append(prices[-1] * (1 + ret))
-    
-    # Create OHLCV data
-    data = []
-    for i, (ts, price) in enumerate(zip(timestamps, prices)):
-        # Add some intraday volatility
-        high = price * (1 + abs(np.random.normal(0, 0.01)))
-        low = price * (1 - abs(np.random.normal(0, 0.01)))
-        open_price = prices[i-1] if i > 0 else price
-        close_price = price
-        volume = abs(np.random.normal(1000000, 200000))
-        
-        data.append({
-            'timestamp': ts,
-            'open': open_price,
-            'high': max(high, open_price, close_price),
-            'low': min(low, open_price, close_price),
-            'close': close_price,
-            'volume': volume
-        })
-    
-    return pd.DataFrame(data)
+@functools.lru_cache(maxsize=None)
+def _build_ohlcv_cached(n_periods: int, price_start: float, add_trend: bool) -> pd.DataFrame:
+    """
+    Build seeded synthetic OHLCV data, memoized per (n_periods, price_start, add_trend).
+    The returned frame is shared between callers, so copy it before mutating.
+    """
+    rng = np.random.default_rng(42)  # For reproducible results
+    
+    # All randomness in one batched draw: returns, high/low intraday noise and volume
+    noise = rng.standard_normal((n_periods, 4))
+    
+    # Generate price series with trend and 2% daily volatility; the first return is unused so prices start at price_start
+    returns = (0.001 if add_trend else 0) + 0.02 * noise[:, 0]
+    growth = 1 + returns
+    growth[0] = 1.0
+    close = price_start * np.cumprod(growth)
+    open_ = np.concatenate((close[:1], close[:-1]))
+    
+    # Add some intraday volatility, keeping high/low consistent with open and close
+    high = np.maximum.reduce([close * (1 + np.abs(0.01 * noise[:, 1])), open_, close])
+    low = np.minimum.reduce([close * (1 - np.abs(0.01 * noise[:, 2])), open_, close])
+    volume = np.abs(1000000 + 200000 * noise[:, 3])
+    
+    return pd.DataFrame({
+        'timestamp': 1640995200 + np.arange(n_periods, dtype=np.int64) * 86400,  # Daily timestamps starting Jan 1, 2022
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': volume
+    })
 
-def create_insufficient_test_data(n_periods: int, price_start: float = 100.0) -> pd.DataFrame:
-    """Create synthetic OHLCV data with insufficient periods for testing edge cases."""
-    np.random.seed(42)  # For reproducible results
-    
-    timestamps = [1640995200 + i * 86400 for i in range(n_periods)]  # Daily timestamps starting Jan 1, 2022
-    
-    # Generate price series with trend and volatility
-    returns = np.random.normal(0.001, 0.02, n_periods)  # 2% daily volatility
-    prices = [price_start]
-    
-    for ret in returns[1:]:
-        prices.append(prices[-1] * (1 + ret))
-    
-    # Create OHLCV data
-    data = []
-    for i, (ts, price) in enumerate(zip(timestamps, prices)):
-        # Add some intraday volatility
-        high = price * (1 + abs(np.random.normal(0, 0.01)))
-        low = price * (1 - abs(np.random.normal(0, 0.01)))
-        open_price = prices[i-1] if i > 0 else price
-        close_price = price
-        volume = abs(np.random.normal(1000000, 200000))
-        
-        data.append({
-            'timestamp': ts,
-            'open': open_price,
-            'high': max(high, open_price, close_price),
-            'low': min(low, open_price, close_price),
-            'close': close_price,
-            'volume': volume
-        })
-    
-    return pd.DataFrame(data)
+def create_test_ohlcv_data(n_periods: int = 200, price_start: float = 100.0, add_trend: bool = True, enforce_min_50: bool = True) -> pd.DataFrame:
+    """
+    Create synthetic OHLCV data for testing (cached; copy before mutating).
+    Pass enforce_min_50=False to get fewer than 50 periods for insufficient-data edge cases.
+    """
+    if enforce_min_50:
+        # Ensure we have at least 50 periods for proper testing
+        n_periods = max(n_periods, 50)
+    return _build_ohlcv_cached(n_periods, price_start, add_trend)
+
+# Session-wide OHLCV frames shared by the signal tests; they are cached and shared, so tests must not mutate them
+@pytest.fixture(scope="session")
+def ohlcv_50() -> pd.DataFrame:
+    return create_test_ohlcv_data(n_periods=50)
+
+@pytest.fixture(scope="session")
+def ohlcv_100() -> pd.DataFrame:
+    return create_test_ohlcv_data(n_periods=100)
+
+@pytest.fixture(scope="session")
+def ohlcv_49() -> pd.DataFrame:
+    return create_test_ohlcv_data(n_periods=49, enforce_min_50=False)
+
+@pytest.fixture(scope="session")
+def ohlcv_minimal() -> pd.DataFrame:
+    return create_test_ohlcv_data(n_periods=5, enforce_min_50=False)
 
 def test_log_returns_calculation():
     """Test log returns calculation for accuracy and edge cases."""
@@ -159,17 +152,13 @@ def test_garch_model():
     """Test GARCH model fitting and forecasting."""
     logger.info("Testing GARCH model...")
     
-    # Create test returns with volatility clustering
-    np.random.seed(42)
+    # Create test returns with volatility clustering; all draws are batched, only the recurrence is sequential
+    rng = np.random.default_rng(42)
     n = 100
-    returns = []
-    vol = 0.02
-    
-    for i in range(n):
-        vol = 0.8 * vol + 0.2 * 0.02 + 0.1 * vol * np.random.normal(0, 1)**2
-        returns.append(np.random.normal(0, vol))
+    vol_shocks_sq = rng.standard_normal(n) ** 2
+    innovations = rng.standard_normal(n)
     
-    returns_series = pd.Series(returns)
+    returns_series = pd.Series(clustered_returns(0.02, vol_shocks_sq, innovations))
     
     # Test GARCH fitting
     garch_results = fit_garch_and_forecast_volatility(returns_series, p=1, q=1, trading_periods_per_year=252)
@@ -233,19 +222,16 @@ def test_fourier_analysis():
     else:
         logger.warning("Fourier detrending returned None")
 
-def test_ta_signals():
+def test_ta_signals(ohlcv_50):
     """Test TA signal generation."""
     logger.info("Testing TA signal generation...")
     
-    # Create test data
-    ohlcv_df = create_test_ohlcv_data(n_periods=50)
-    
     # Generate TA signals
     ta_signals = generate_ta_signals(
         asset_symbol="TEST",
         chain_id=1,
         base_token_address="0x123",
-        ohlcv_df=ohlcv_df
+        ohlcv_df=ohlcv_50
     )
     
     # Validate signals
@@ -262,19 +248,16 @@ def test_ta_signals():
     
     logger.info(f"✓ TA signals test passed - generated {len(ta_signals)} signals")
 
-def test_quant_signals():
+def test_quant_signals(ohlcv_100):
     """Test Quant signal generation."""
     logger.info("Testing Quant signal generation...")
     
-    # Create test data
-    ohlcv_df = create_test_ohlcv_data(n_periods=100)
-    
     # Generate Quant signals
     quant_signals = generate_quant_advanced_signals(
         asset_symbol="TEST",
         chain_id=1,
         base_token_address="0x123",
-        ohlcv_df=ohlcv_df,
+        ohlcv_df=ohlcv_100,
         trading_periods_per_year=252
     )
     
@@ -288,92 +271,50 @@ def test_quant_signals():
     
     logger.info(f"✓ Quant signals test passed - generated {len(quant_signals)} signals")
 
-def test_50_plus_data_points():
-    """Test that forecast functions work properly with 50+ data points."""
-    logger.info("Testing 50+ data points validation...")
-    
-    # Test with exactly 50 points
-    ohlcv_df_50 = create_test_ohlcv_data(n_periods=50)
-    
-    # Test TA signals with 50 points
-    ta_signals_50 = generate_ta_signals(
-        asset_symbol="TEST_50",
-        chain_id=1,
-        base_token_address="0x123",
-        ohlcv_df=ohlcv_df_50
-    )
-    
-    # Test Quant signals with 50 points
-    quant_signals_50 = generate_quant_advanced_signals(
-        asset_symbol="TEST_50",
+def _ta_signals_for(asset_symbol: str, ohlcv_df: pd.DataFrame) -> list:
+    return generate_ta_signals(asset_symbol=asset_symbol, chain_id=1, base_token_address="0x123", ohlcv_df=ohlcv_df)
+
+def _quant_signals_for(asset_symbol: str, ohlcv_df: pd.DataFrame) -> list:
+    return generate_quant_advanced_signals(
+        asset_symbol=asset_symbol,
         chain_id=1,
         base_token_address="0x123",
-        ohlcv_df=ohlcv_df_50,
-        trading_periods_per_year=252
-    )
-    
-    # Test with 100 points for comparison
-    ohlcv_df_100 = create_test_ohlcv_data(n_periods=100)
-    
-    ta_signals_100 = generate_ta_signals(
-        asset_symbol="TEST_100",
-        chain_id=1,
-        token_address="0x123",
-        ohlcv_df=ohlcv_df_100
-    )
-    
-    quant_signals_100 = generate_quant_advanced_signals(
-        asset_symbol="TEST_100",
-        chain_id=1,
-        token_address="0x123",
-        ohlcv_df=ohlcv_df_100,
+        ohlcv_df=ohlcv_df,
         trading_periods_per_year=252
     )
-    
-    # Test with insufficient data (49 points)
-    ohlcv_df_49 = create_insufficient_test_data(n_periods=49)
-    
-    ta_signals_49 = generate_ta_signals(
-        asset_symbol="TEST_49",
-        chain_id=1,
-        token_address="0x123",
-        ohlcv_df=ohlcv_df_49
-    )
-    
-    quant_signals_49 = generate_quant_advanced_signals(
-        asset_symbol="TEST_49",
-        chain_id=1,
-        token_address="0x123",
-        ohlcv_df=ohlcv_df_49,
-        trading_periods_per_year=252
+
+def _check_min_data_points(generator, ohlcv_df: pd.DataFrame, expect_empty: bool):
+    signals = generator(f"TEST_{len(ohlcv_df)}", ohlcv_df)
+    assert (len(signals) == 0) == expect_empty, (
+        f"{generator.__name__} on {len(ohlcv_df)} points returned {len(signals)} signals (expected {'none' if expect_empty else 'some'})"
     )
-    
-    # Validate results
-    assert len(ta_signals_50) >= 0, "TA signals should work with 50 data points"
-    assert len(quant_signals_50) >= 0, "Quant signals should work with 50 data points"
-    assert len(ta_signals_100) >= len(ta_signals_50), "More data should produce at least as many signals"
-    assert len(quant_signals_100) >= len(quant_signals_50), "More data should produce at least as many signals"
-    assert len(ta_signals_49) == 0, "TA signals should not work with insufficient data"
-    assert len(quant_signals_49) == 0, "Quant signals should not work with insufficient data"
-    
-    logger.info(f"✓ 50+ data points test passed - TA: 50pts={len(ta_signals_50)}, 100pts={len(ta_signals_100)}, 49pts={len(ta_signals_49)}")
-    logger.info(f"✓ 50+ data points test passed - Quant: 50pts={len(quant_signals_50)}, 100pts={len(quant_signals_100)}, 49pts={len(quant_signals_49)}")
+    logger.info(f"✓ 50+ data points test passed - {generator.__name__}: {len(ohlcv_df)}pts={len(signals)}")
+
+@pytest.mark.parametrize("generator", [_ta_signals_for, _quant_signals_for], ids=["ta", "quant"])
+@pytest.mark.parametrize("ohlcv_fixture, expect_empty", [
+    ("ohlcv_50", False),   # Exactly the 50-point minimum
+    ("ohlcv_100", False),
+    ("ohlcv_49", True),    # Insufficient data
+])
+def test_50_plus_data_points(generator, ohlcv_fixture, expect_empty, request):
+    """Test that forecast functions produce signals with 50+ data points and none below that."""
+    _check_min_data_points(generator, request.getfixturevalue(ohlcv_fixture), expect_empty)
 
-def test_edge_cases():
+def test_edge_cases(ohlcv_minimal):
     """Test edge cases and error handling."""
     logger.info("Testing edge cases...")
     
     # Test with minimal data (should fail gracefully)
-    minimal_data = create_insufficient_test_data(n_periods=5)
+    minimal_data = ohlcv_minimal
     ta_signals_minimal = generate_ta_signals("TEST_MINIMAL", 1, "0x123", minimal_data)
     quant_signals_minimal = generate_quant_advanced_signals("TEST_MINIMAL", 1, "0x123", minimal_data)
     assert len(ta_signals_minimal) == 0
     assert len(quant_signals_minimal) == 0
     
     # Test with data containing some NaN values
-    nan_data = create_test_ohlcv_data(n_periods=60)  # Increased from 50 to 60
+    nan_data = create_test_ohlcv_data(n_periods=60).copy()  # Increased from 50 to 60; copied since the NaN injection mutates it
     # Introduce some NaN values (but not too many)
-    nan_indices = np.random.choice(len(nan_data), size=6, replace=False)  # 10% NaN
+    nan_indices = np.random.default_rng(42).choice(len(nan_data), size=6, replace=False)  # 10% NaN; seeded so the NaN layout is reproducible
     nan_data.loc[nan_indices, 'close'] = np.nan
     
     ta_signals_nan = generate_ta_signals("TEST_NAN", 1, "0x123", nan_data)
@@ -395,10 +336,16 @@ def main():
         test_garch_model()
         test_var_cvar_calculation()
         test_fourier_analysis()
-        test_ta_signals()
-        test_quant_signals()
-        test_50_plus_data_points()
-        test_edge_cases()
+        # Outside pytest there is no fixture injection, so pass the frames explicitly
+        ohlcv_50 = create_test_ohlcv_data(n_periods=50)
+        ohlcv_100 = create_test_ohlcv_data(n_periods=100)
+        test_ta_signals(ohlcv_50)
+        test_quant_signals(ohlcv_100)
+        for generator in (_ta_signals_for, _quant_signals_for):
+            _check_min_data_points(generator, ohlcv_50, expect_empty=False)
+            _check_min_data_points(generator, ohlcv_100, expect_empty=False)
+            _check_min_data_points(generator, create_test_ohlcv_data(n_periods=49, enforce_min_50=False), expect_empty=True)
+        test_edge_cases(create_test_ohlcv_data(n_periods=5, enforce_min_50=False))
         
         logger.info("🎉 All tests passed! Forecast modules are working correctly with 50+ data points.")
         
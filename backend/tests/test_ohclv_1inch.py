@@ -1,10 +1,16 @@
 # test_one_inch_ohlcv_api_with_logging_v2.py
 
 import pytest
-import requests
+import asyncio
+import numpy as np
+import orjson
+import httpx
 import time
 import logging
-import os
+from itertools import chain
+from operator import attrgetter, itemgetter
+from typing import List
+from pydantic import BaseModel, TypeAdapter, ValidationError
 import sys # Added for path manipulation
 from pathlib import Path # Added for path manipulation
 
@@ -12,7 +18,7 @@ from pathlib import Path # Added for path manipulation
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
 # --- Import service functions ---
-from backend.services.one_inch_service import (
+from backend.services.one_inch_data_service import (
     get_ohlcv_data, 
     get_cross_prices_data,
     fetch_1inch_whitelisted_tokens,
@@ -28,8 +34,11 @@ from backend.services.one_inch_service import (
     ARBITRUM_CHAIN_ID,     # Keep for direct use
     PERIOD_DAILY_SECONDS,  # Keep for direct use
     GRANULARITY_DAILY,     # Keep for direct use
-    GRANULARITY_HOURLY     # Keep for direct use
+    GRANULARITY_HOURLY,    # Keep for direct use
+    PERIOD_TO_GRANULARITY
 )
+from backend.tests.oneinch_client import module_on_one_process
+from backend.tests.numba_kernels import CANDLE_CHECK_MESSAGES, first_bad_candle
 
 # --- Logging Configuration ---
 logger = logging.getLogger(__name__)
@@ -41,15 +50,21 @@ if not logger.handlers:
     ch.setFormatter(formatter)
     logger.addHandler(ch)
 
+# Every test in this module talks to the live 1inch API; deselect with -m "not network".
+# The calls already run concurrently inside one process (session prefetches). Under pytest-xdist keep the module on
+# a single worker with --dist=loadfile, so it still prefetches and gets the key's whole rate budget while the other
+# modules run on the remaining workers (with other distributions each worker fetches its own cases one by one):
+#   pytest -n auto --dist=loadfile -m "not serial" backend/tests
+# To run offline (e.g. in CI), record the responses once with --live (without -n) and replay them with --replay.
+pytestmark = pytest.mark.network
+
 # --- Configuration ---
 CHARTS_API_BASE_URL = "https://api.1inch.dev/charts/v1.0/chart/aggregated/candle"
 PORTFOLIO_API_DOMAIN = "https://api.1inch.dev/portfolio"
 CROSS_PRICES_ENDPOINT_PATH = "/integrations/prices/v2/time_range/cross_prices"
 PORTFOLIO_CROSS_PRICES_API_URL = f"{PORTFOLIO_API_DOMAIN}{CROSS_PRICES_ENDPOINT_PATH}"
 
-API_KEY = os.getenv("ONE_INCH_API_KEY", "PrA0uavUMpVOig4aopY0MQMqti3gO19d")
-if API_KEY == "PrA0uavUMpVOig4aopY0MQMqti3gO19d":
-    logger.warning("Using default/example 1inch API Key. Consider setting ONE_INCH_API_KEY environment variable for full access.")
+# The API key comes from the session-scoped oneinch_cfg fixture in conftest.py
 
 # NATIVE_ETH_ADDRESS is now NATIVE_ASSET_ADDRESS from inch_service
 # USDC_ETHEREUM_ADDRESS, USDC_BASE_ADDRESS are available from inch_service via USDC_ADDRESSES or direct import
@@ -63,29 +78,30 @@ GRANULARITY_MAP_PORTFOLIO_V2 = {
     "1h": "hour"
 }
 
-def _make_1inch_api_request(url: str, params: dict = None, api_description: str = "1inch API"):
+# --- API requests ---
+# Sent through the oneinch_http fixture's client (conftest.py), which adds the auth header, rate limit and cache
+async def _make_1inch_api_request(client: httpx.AsyncClient, url: str, params: dict = None, api_description: str = "1inch API"):
     logger.info(f"Attempting to fetch data from {api_description} URL: {url} with params: {params}")
-    headers = {
-        "Authorization": f"Bearer {API_KEY}",
-        "Accept": "application/json"
-    }
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=30)
-        logger.debug(f"Request URL: {response.url}")
-        logger.debug(f"Request headers: {headers}")
-        logger.debug(f"Response status code: {response.status_code}")
-        logger.debug(f"Response raw text (first 500 chars): {response.text[:500]}")
+        response = await client.get(url, params=params)
+        if response.extensions.get("from_cache"):
+            logger.debug(f"Served {api_description} from the local HTTP cache.")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Request URL: {response.url}")
+            logger.debug(f"Response status code: {response.status_code}")
+            logger.debug(f"Response raw text (first 500 chars): {response.text[:500]}")
         response.raise_for_status()
-        json_response = response.json()
+        # orjson parses the raw bytes directly; its decode error is a ValueError, handled below like before
+        json_response = orjson.loads(response.content)
         logger.info(f"Successfully fetched data from {api_description} for URL: {url}.")
         return json_response
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         logger.error(f"API request timed out for {api_description} URL: {url}")
         pytest.fail(f"API request timed out for {api_description} URL: {url}")
-    except requests.exceptions.HTTPError as http_err:
+    except httpx.HTTPStatusError as http_err:
         logger.error(f"HTTP error for {api_description}: {http_err} - Status: {response.status_code} - Text: {response.text}")
         pytest.fail(f"HTTP error for {api_description}: {http_err} - Response: {response.text}")
-    except requests.exceptions.RequestException as req_err:
+    except httpx.RequestError as req_err:
         logger.error(f"API request failed for {api_description}: {req_err}")
         pytest.fail(f"API request failed for {api_description}: {req_err}")
     except ValueError as json_err:
@@ -95,9 +111,65 @@ def _make_1inch_api_request(url: str, params: dict = None, api_description: str
         pytest.fail(f"JSON decode error from {api_description}: {json_err}. Text: {response_text_snippet[:500]}")
     return None
 
-def fetch_1inch_ohlcv_data(token0_address: str, token1_address: str, seconds: int, chain_id: int):
+async def fetch_1inch_ohlcv_data(client: httpx.AsyncClient, token0_address: str, token1_address: str, seconds: int, chain_id: int):
     url = f"{CHARTS_API_BASE_URL}/{token0_address}/{token1_address}/{seconds}/{chain_id}"
-    return _make_1inch_api_request(url, api_description=f"1inch Charts API (OHLCV {token0_address[:6]}/{token1_address[:6]} on chain {chain_id})")
+    return await _make_1inch_api_request(client, url, api_description=f"1inch Charts API (OHLCV {token0_address[:6]}/{token1_address[:6]} on chain {chain_id})")
+
+# --- Response schemas ---
+# Validated in one TypeAdapter call per response; numeric strings are coerced to float as before
+class Candle(BaseModel):
+    time: float
+    open: float
+    high: float
+    low: float
+    close: float
+
+class PricePoint(BaseModel):
+    timestamp: float
+    open: float
+    high: float
+    low: float
+    close: float
+    avg: float
+
+_CANDLE_LIST_ADAPTER = TypeAdapter(List[Candle])
+_PRICE_POINT_LIST_ADAPTER = TypeAdapter(List[PricePoint])
+# Column order of the packed matrices; fixed per schema, so resolved once here rather than per response
+_CANDLE_FIELDS = tuple(Candle.model_fields)
+_PRICE_POINT_FIELDS = tuple(PricePoint.model_fields)
+# Prebuilt C-level getters pulling a whole row's fields as one tuple
+_ROW_GETTERS = {fields: attrgetter(*fields) for fields in (_CANDLE_FIELDS, _PRICE_POINT_FIELDS)}
+_RAW_ROW_GETTERS = {fields: itemgetter(*fields) for fields in (_CANDLE_FIELDS, _PRICE_POINT_FIELDS)}
+_JSON_NUMBER_TYPES = {int, float}
+
+def _assert_all_rows(mask: np.ndarray, message: str, description: str, label: str):
+    """
+    Asserts a per-row check holds for every row, naming the first offending one.
+    `message` is a template filled with `description` only on failure, so passing checks format nothing.
+    """
+    if not mask.all():
+        raise AssertionError(f"{label} #{int(np.argmax(~mask))} {message.format(description)}")
+
+def _candle_matrix(rows: list, adapter: TypeAdapter, fields: tuple, description: str, label: str) -> np.ndarray:
+    """
+    Packs `fields` of every row into a float64 matrix (one column per field, in the given order).
+    Rows whose values are all JSON numbers need no coercion and are packed directly; anything else (numeric strings,
+    missing keys, non-dict rows) goes through the adapter's schema, failing the test with pydantic's per-row errors.
+    """
+    try:
+        values = list(chain.from_iterable(map(_RAW_ROW_GETTERS[fields], rows)))
+    except (KeyError, TypeError):
+        values = None
+    if values is not None and set(map(type, values)) <= _JSON_NUMBER_TYPES:
+        return np.array(values, dtype=np.float64).reshape(len(rows), len(fields))
+    try:
+        records = adapter.validate_python(rows)
+    except ValidationError as e:
+        pytest.fail(f"{label} list failed schema validation for {description}: {e}")
+    row_values = _ROW_GETTERS[fields]
+    # Stream the values straight into a preallocated buffer; avoids np.asarray's nested-sequence inference
+    flat = np.fromiter(chain.from_iterable(map(row_values, records)), dtype=np.float64, count=len(records) * len(fields))
+    return flat.reshape(len(records), len(fields))
 
 def validate_ohlcv_response_structure(response_data: dict, pair_description: str):
     logger.info(f"Validating OHLCV response for {pair_description}")
@@ -108,26 +180,14 @@ def validate_ohlcv_response_structure(response_data: dict, pair_description: str
     if not candle_list:
         logger.warning(f"Empty candle data list for {pair_description}.")
         return
-    for i, candle in enumerate(candle_list):
-        assert isinstance(candle, dict), f"Candle #{i} not a dict for {pair_description}"
-        expected_keys = {"time", "open", "high", "low", "close"}
-        assert expected_keys.issubset(candle.keys()), f"Candle #{i} missing keys for {pair_description}. Expected: {expected_keys}, Got: {list(candle.keys())}"
-        for key in expected_keys:
-            assert isinstance(candle[key], (int, float, str)), f"Candle #{i}['{key}'] wrong type for {pair_description}"
-            try:
-                float(candle[key])
-            except ValueError:
-                pytest.fail(f"Candle #{i}['{key}'] ('{candle[key]}') not convertible to float for {pair_description}.")
-        c_high, c_low, c_open, c_close, c_time = map(float, [candle["high"], candle["low"], candle["open"], candle["close"], candle["time"]])
-        assert c_high >= c_low, f"Candle #{i} H<L for {pair_description}"
-        assert c_high >= c_open, f"Candle #{i} H<O for {pair_description}"
-        assert c_high >= c_close, f"Candle #{i} H<C for {pair_description}"
-        assert c_low <= c_open, f"Candle #{i} L>O for {pair_description}"
-        assert c_low <= c_close, f"Candle #{i} L>C for {pair_description}"
-        assert c_time > 1_000_000_000, f"Candle #{i} time too small for {pair_description}"
+    # One float64 cast for the whole response, then a compiled pass over the OHLC sanity checks
+    candles = _candle_matrix(candle_list, _CANDLE_LIST_ADAPTER, _CANDLE_FIELDS, pair_description, "Candle")
+    bad_row, bad_check = first_bad_candle(candles)
+    if bad_row >= 0:
+        raise AssertionError(f"Candle #{bad_row} {CANDLE_CHECK_MESSAGES[bad_check].format(pair_description)}")
     logger.info(f"Validated OHLCV structure for {pair_description} ({len(candle_list)} candles).")
 
-def fetch_1inch_cross_prices_data(chain_id: int, token_address: str, vs_token_address: str, time_from: int, time_to: int, granularity: str):
+async def fetch_1inch_cross_prices_data(client: httpx.AsyncClient, chain_id: int, token_address: str, vs_token_address: str, time_from: int, time_to: int, granularity: str):
     # Map to new Portfolio API v2 parameter names and granularity values
     params = {
         "chain_id": chain_id, # Was chainId
@@ -139,7 +199,7 @@ def fetch_1inch_cross_prices_data(chain_id: int, token_address: str, vs_token_ad
     }
     # This URL is now hitting the server but getting 422 due to parameter issues.
     logger.info(f"Attempting to use Portfolio API endpoint {PORTFOLIO_CROSS_PRICES_API_URL} with new v2 params: {params}")
-    return _make_1inch_api_request(PORTFOLIO_CROSS_PRICES_API_URL, params=params, api_description=f"1inch Portfolio API (Cross Prices {token_address[:6]}/{vs_token_address[:6]} on chain {chain_id})")
+    return await _make_1inch_api_request(client, PORTFOLIO_CROSS_PRICES_API_URL, params=params, api_description=f"1inch Portfolio API (Cross Prices {token_address[:6]}/{vs_token_address[:6]} on chain {chain_id})")
 
 def validate_cross_prices_response_structure(response_data: list, request_description: str):
     """
@@ -155,68 +215,154 @@ def validate_cross_prices_response_structure(response_data: list, request_descri
         logger.warning(f"Received empty price data list for {request_description}. This might be okay for some periods but can be unexpected.")
         return # Allow empty list but log a warning
 
-    for i, price_point_dict in enumerate(response_data):
-        logger.debug(f"Validating price point dictionary #{i} for {request_description}")
-        assert isinstance(price_point_dict, dict), f"Expected price point #{i} to be a dict for {request_description}, got {type(price_point_dict)}"
-        
-        # Keys for the Portfolio v2 'prices' endpoint seem to be like OHLCV
-        expected_keys = {"timestamp", "open", "high", "low", "close", "avg"}
-        assert expected_keys.issubset(price_point_dict.keys()), \
-            f"Price point dict #{i} for {request_description} missing one or more keys. Expected subset: {expected_keys}, Got: {list(price_point_dict.keys())}"
-
-        for key in expected_keys:
-            assert isinstance(price_point_dict[key], (int, float, str)), \
-                f"Price point dict #{i}['{key}'] for {request_description} expected to be int, float, or string, got {type(price_point_dict[key])} with value {price_point_dict[key]}"
-            try:
-                numeric_value = float(price_point_dict[key])
-            except ValueError:
-                pytest.fail(f"Price point dict #{i}['{key}'] for {request_description} with value '{price_point_dict[key]}' could not be converted to float.")
-            
-            if key == "timestamp":
-                 assert numeric_value > 1_000_000_000, f"Price point dict #{i} for {request_description}: Timestamp {numeric_value} seems too small."
-            elif key in ["open", "high", "low", "close", "avg"]:
-                 assert numeric_value >= 0, f"Price point dict #{i}['{key}'] for {request_description} expected to be non-negative, got {numeric_value}"
-        
-        # Basic sanity checks for OHLC values if present
-        c_high = float(price_point_dict["high"])
-        c_low = float(price_point_dict["low"])
-        c_open = float(price_point_dict["open"])
-        c_close = float(price_point_dict["close"])
-
-        assert c_high >= c_low, f"Price point dict #{i} for {request_description}: High ({c_high}) must be >= Low ({c_low})"
-        assert c_high >= c_open, f"Price point dict #{i} for {request_description}: High ({c_high}) must be >= Open ({c_open})"
-        assert c_high >= c_close, f"Price point dict #{i} for {request_description}: High ({c_high}) must be >= Close ({c_close})"
-        assert c_low <= c_open, f"Price point dict #{i} for {request_description}: Low ({c_low}) must be <= Open ({c_open})"
-        assert c_low <= c_close, f"Price point dict #{i} for {request_description}: Low ({c_low}) must be <= Close ({c_close})"
+    # Keys for the Portfolio v2 'prices' endpoint seem to be like OHLCV; cast them all at once and check in bulk
+    label = "Price point dict"
+    prices = _candle_matrix(response_data, _PRICE_POINT_LIST_ADAPTER, _PRICE_POINT_FIELDS, request_description, label)
+    p_time, p_open, p_high, p_low, p_close, _ = prices.T
+    _assert_all_rows(~np.isnan(prices).any(axis=1), "for {} has NaN values", request_description, label)
+    _assert_all_rows(p_time > 1_000_000_000, "for {}: Timestamp seems too small.", request_description, label)
+    _assert_all_rows((prices[:, 1:] >= 0).all(axis=1), "for {}: open/high/low/close/avg expected to be non-negative", request_description, label)
+    _assert_all_rows(p_high >= p_low, "for {}: High must be >= Low", request_description, label)
+    _assert_all_rows(p_high >= p_open, "for {}: High must be >= Open", request_description, label)
+    _assert_all_rows(p_high >= p_close, "for {}: High must be >= Close", request_description, label)
+    _assert_all_rows(p_low <= p_open, "for {}: Low must be <= Open", request_description, label)
+    _assert_all_rows(p_low <= p_close, "for {}: Low must be <= Close", request_description, label)
 
     logger.info(f"Successfully validated Cross Prices response structure for {request_description} with {len(response_data)} price points (Portfolio v2 structure).")
 
-@pytest.mark.parametrize("token0, token1, chain_id, network_name", [
+# --- Concurrent prefetch of the parametrized API calls ---
+OHLCV_TEST_CASES = [
     (NATIVE_ASSET_ADDRESS, USDC_ADDRESSES[ETHEREUM_CHAIN_ID], ETHEREUM_CHAIN_ID, "Ethereum (Native/USDC)"),
     (WETH_ETHEREUM_ADDRESS, USDC_ADDRESSES[ETHEREUM_CHAIN_ID], ETHEREUM_CHAIN_ID, "Ethereum (WETH/USDC)"),
     (NATIVE_ASSET_ADDRESS, USDC_ADDRESSES[BASE_CHAIN_ID], BASE_CHAIN_ID, "Base (Native/USDC)"),
     (NATIVE_ASSET_ADDRESS, USDC_ADDRESSES[ARBITRUM_CHAIN_ID], ARBITRUM_CHAIN_ID, "Arbitrum (Native/USDC.e Bridged)"),
-])
-def test_get_eth_usdc_ohlcv_on_multiple_networks(token0, token1, chain_id, network_name):
+]
+
+CROSS_PRICES_TEST_CASES = [
+    (WETH_ETHEREUM_ADDRESS, USDC_ADDRESSES[ETHEREUM_CHAIN_ID], ETHEREUM_CHAIN_ID, GRANULARITY_DAILY, "Ethereum (WETH/USDC Daily) Portfolio"),
+    (NATIVE_ASSET_ADDRESS, USDC_ADDRESSES[ETHEREUM_CHAIN_ID], ETHEREUM_CHAIN_ID, GRANULARITY_HOURLY, "Ethereum (Native/USDC Hourly) Portfolio"),
+    (NATIVE_ASSET_ADDRESS, USDC_ADDRESSES[ARBITRUM_CHAIN_ID], ARBITRUM_CHAIN_ID, GRANULARITY_DAILY, "Arbitrum (Native/USDC.e Bridged) Portfolio")
+]
+
+MAX_CONCURRENT_REQUESTS = 5  # In-flight request cap for the prefetch, in line with the ~5 requests/second quota
+
+def _cross_prices_window(granularity: str):
+    """(time_from, time_to) for a cross-prices case, ending now."""
+    time_to = int(time.time())
+    time_from = time_to - (7*86400 if granularity == GRANULARITY_DAILY else 1*86400)
+    return time_from, time_to
+
+async def _gather_limited(client: httpx.AsyncClient, calls: list) -> list:
+    """
+    Awaits the (coroutine function, args) calls concurrently, each as func(client, *args), with at most
+    MAX_CONCURRENT_REQUESTS in flight. Results come back in order; a call that raised (including pytest.fail)
+    yields its exception instead.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+    async def run(func, args):
+        async with semaphore:
+            return await func(client, *args)
+
+    return await asyncio.gather(*(run(func, args) for func, args in calls), return_exceptions=True)
+
+def _selected_params(session, argname: str) -> set:
+    """
+    Params the selected tests (after -k/-m deselection) pass to a parametrized fixture, so prefetches skip the rest.
+    Empty when the module's tests are spread over xdist workers: a worker only learns which tests it runs as they are
+    scheduled, so each fetches its own cases on demand instead of prefetching the whole collection.
+    """
+    params = set()
+    if not module_on_one_process(session.config):
+        return params
+    for item in session.items:
+        callspec = getattr(item, "callspec", None)
+        if callspec is not None and argname in callspec.params:
+            params.add(callspec.params[argname])
+    return params
+
+@pytest.fixture(scope="session")
+def prefetched_responses(request, oneinch_http):
+    """
+    Fetches every selected OHLCV and cross-prices test case concurrently up front, so the network cost is about one
+    round trip instead of one per case. Keyed by the case's kind and request arguments; cases missing from it are
+    fetched by their own fixture.
+    """
+    calls = {}
+    for case in _selected_params(request.session, "ohlcv_response"):
+        calls[("ohlcv", *case)] = _ohlcv_call(*case)
+    for case in _selected_params(request.session, "cross_prices_response"):
+        calls[("cross_prices", *case)] = _cross_prices_call(*case)
+    if not calls:
+        return {}
+    logger.info(f"Prefetching {len(calls)} 1inch API responses concurrently...")
+    results = oneinch_http.run(lambda client: _gather_limited(client, list(calls.values())))
+    return dict(zip(calls, results))
+
+def _ohlcv_call(token0: str, token1: str, chain_id: int):
+    """(coroutine function, args) fetching an OHLCV test case's daily candles, for _gather_limited."""
+    return fetch_1inch_ohlcv_data, (token0, token1, PERIOD_DAILY_SECONDS, chain_id)
+
+def _cross_prices_call(token_address: str, vs_token_address: str, chain_id: int, granularity: str):
+    """(coroutine function, args) fetching a cross-prices test case, for _gather_limited."""
+    time_from, time_to = _cross_prices_window(granularity)
+    return fetch_1inch_cross_prices_data, (chain_id, token_address, vs_token_address, time_from, time_to, granularity)
+
+def _prefetched_or_fetch(oneinch_http, prefetched: dict, key, call):
+    """The prefetched result for key, else the result (or exception) of fetching `call` now."""
+    if key in prefetched:
+        return prefetched[key]
+    return oneinch_http.run(lambda client: _gather_limited(client, [call]))[0]
+
+def _raise_if_failed(result):
+    """Returns a prefetched response, re-raising its failure inside the test that asked for it."""
+    if isinstance(result, BaseException):
+        raise result
+    return result
+
+# Indirectly parametrized with the request arguments. Being session-scoped, pytest caches one value per distinct
+# param, so any test parametrized with the same arguments shares the response instead of looking it up again.
+@pytest.fixture(scope="session")
+def ohlcv_response(request, oneinch_http, prefetched_responses):
+    """(token0, token1, chain_id, daily OHLCV response or the exception its fetch raised) for request.param."""
+    token0, token1, chain_id = request.param
+    result = _prefetched_or_fetch(oneinch_http, prefetched_responses, ("ohlcv", *request.param), _ohlcv_call(*request.param))
+    return token0, token1, chain_id, result
+
+@pytest.fixture(scope="session")
+def cross_prices_response(request, oneinch_http, prefetched_responses):
+    """(token, vs_token, chain_id, granularity, cross-prices response or the exception its fetch raised) for request.param."""
+    token_address, vs_token_address, chain_id, granularity = request.param
+    result = _prefetched_or_fetch(oneinch_http, prefetched_responses, ("cross_prices", *request.param), _cross_prices_call(*request.param))
+    return token_address, vs_token_address, chain_id, granularity, result
+
+@pytest.mark.parametrize(
+    "ohlcv_response, network_name",
+    [(case[:3], case[3]) for case in OHLCV_TEST_CASES],
+    indirect=["ohlcv_response"],
+    ids=[case[3] for case in OHLCV_TEST_CASES]
+)
+def test_get_eth_usdc_ohlcv_on_multiple_networks(ohlcv_response, network_name):
+    token0, token1, chain_id, result = ohlcv_response
     logger.info(f"--- Starting Charts API test for {network_name} (Chain ID: {chain_id}) ---")
     pair_desc = f"{network_name} [{token0[:6]}/{token1[:6]}] OHLCV"
-    ohlcv_data = fetch_1inch_ohlcv_data(token0, token1, PERIOD_DAILY_SECONDS, chain_id)
+    ohlcv_data = _raise_if_failed(result)
     assert ohlcv_data is not None, f"Fetch failed for {pair_desc}."
     validate_ohlcv_response_structure(ohlcv_data, pair_desc)
     logger.info(f"OHLCV data OK for {pair_desc}. Sample: {ohlcv_data['data'][0] if ohlcv_data.get('data') else 'No data'}")
     logger.info(f"--- Charts API Test for {network_name} PASSED ---")
 
-@pytest.mark.parametrize("token_address, vs_token_address, chain_id, granularity, network_name", [
-    (WETH_ETHEREUM_ADDRESS, USDC_ADDRESSES[ETHEREUM_CHAIN_ID], ETHEREUM_CHAIN_ID, GRANULARITY_DAILY, "Ethereum (WETH/USDC Daily) Portfolio"),
-    (NATIVE_ASSET_ADDRESS, USDC_ADDRESSES[ETHEREUM_CHAIN_ID], ETHEREUM_CHAIN_ID, GRANULARITY_HOURLY, "Ethereum (Native/USDC Hourly) Portfolio"),
-    (NATIVE_ASSET_ADDRESS, USDC_ADDRESSES[ARBITRUM_CHAIN_ID], ARBITRUM_CHAIN_ID, GRANULARITY_DAILY, "Arbitrum (Native/USDC.e Bridged) Portfolio")
-])
-def test_get_cross_prices_on_multiple_networks(token_address, vs_token_address, chain_id, granularity, network_name):
+@pytest.mark.parametrize(
+    "cross_prices_response, network_name",
+    [(case[:4], case[4]) for case in CROSS_PRICES_TEST_CASES],
+    indirect=["cross_prices_response"],
+    ids=[case[4] for case in CROSS_PRICES_TEST_CASES]
+)
+def test_get_cross_prices_on_multiple_networks(cross_prices_response, network_name):
+    token_address, vs_token_address, chain_id, granularity, result = cross_prices_response
     logger.info(f"--- Starting Portfolio API test for {network_name} (Gran: {granularity}) ---")
     req_desc = f"{network_name} [{token_address[:6]}/{vs_token_address[:6]}] CrossPrices"
-    time_to = int(time.time())
-    time_from = time_to - (7*86400 if granularity == GRANULARITY_DAILY else 1*86400)
-    cross_prices_data = fetch_1inch_cross_prices_data(chain_id, token_address, vs_token_address, time_from, time_to, granularity)
+    cross_prices_data = _raise_if_failed(result)
     assert cross_prices_data is not None, f"Fetch failed for {req_desc}."
     validate_cross_prices_response_structure(cross_prices_data, req_desc)
     logger.info(f"CrossPrices data OK for {req_desc}. Sample: {cross_prices_data[0] if cross_prices_data else 'No data'}")
@@ -248,19 +394,47 @@ def validate_token_list_structure(token_list: list, chain_id_description: str):
     logger.info(f"Successfully validated token list structure for {chain_id_description} with {len(token_list)} tokens.")
 
 # --- Test Cases for Token API ---
-@pytest.mark.parametrize("chain_id, network_name", [
+WHITELIST_TEST_CHAINS = [
     (ETHEREUM_CHAIN_ID, "Ethereum"),
     (BASE_CHAIN_ID, "Base"),
     (ARBITRUM_CHAIN_ID, "Arbitrum"),
     (137, "Polygon"), # Example of another chain ID that might be in the list
-])
-def test_get_whitelisted_tokens_for_chain(chain_id, network_name):
+]
+
+async def _fetch_whitelist(client: httpx.AsyncClient, chain_id: int):
+    """One chain's whitelist through the service, which oneinch_http points at `client`."""
+    return await fetch_1inch_whitelisted_tokens(chain_id_filter=chain_id)
+
+@pytest.fixture(scope="session")
+def prefetched_whitelists(request, oneinch_http):
+    """
+    Every selected test chain's whitelist, fetched concurrently in one warm-up so setup costs about one round trip.
+    The service coroutines send through oneinch_http's client (rate limit, cache, cassettes). Chains missing from
+    it are fetched by whitelisted_tokens.
+    """
+    chains = [chain for chain in WHITELIST_TEST_CHAINS if chain in _selected_params(request.session, "whitelisted_tokens")]
+    if not chains:
+        return {}
+    calls = [(_fetch_whitelist, (chain_id,)) for chain_id, _ in chains]
+    logger.info(f"Prefetching whitelists for {len(chains)} chains concurrently...")
+    results = oneinch_http.run(lambda client: _gather_limited(client, calls))
+    return {chain_id: result for (chain_id, _), result in zip(chains, results)}
+
+@pytest.fixture(scope="session", params=WHITELIST_TEST_CHAINS, ids=[name for _, name in WHITELIST_TEST_CHAINS])
+def whitelisted_tokens(request, oneinch_http, prefetched_whitelists):
+    """
+    Each chain's whitelist, fetched once per pytest run and shared by every test that asks for it.
+    Yields (chain_id, network_name, token_list); an API error is returned in place of the list so the test reports it.
+    """
+    chain_id, network_name = request.param
+    return chain_id, network_name, _prefetched_or_fetch(oneinch_http, prefetched_whitelists, chain_id, (_fetch_whitelist, (chain_id,)))
+
+def test_get_whitelisted_tokens_for_chain(whitelisted_tokens):
+    chain_id, network_name, token_list = whitelisted_tokens
     logger.info(f"--- Starting Token API test for {network_name} (Chain ID: {chain_id}) ---")
-    try:
-        token_list = fetch_1inch_whitelisted_tokens(chain_id_filter=chain_id)
-    except OneInchAPIError as e:
-        pytest.fail(f"Token API request failed for {network_name}: {e}")
-        return
+    if isinstance(token_list, OneInchAPIError):
+        pytest.fail(f"Token API request failed for {network_name}: {token_list}")
+    token_list = _raise_if_failed(token_list)
 
     assert token_list is not None, f"Failed to fetch token list for {network_name}, result is None."
     # We can't assert len(token_list) > 0 because a chain might legitimately have 0 whitelisted tokens or not be in the API response
@@ -275,75 +449,93 @@ def test_get_whitelisted_tokens_for_chain(chain_id, network_name):
     logger.info(f"--- Token API Test for {network_name} (Chain ID: {chain_id}) PASSED ---")
 
 # --- Screener Test (Conceptual) ---
+
 @pytest.mark.skip(reason="Conceptual test, involves multiple API calls and may be slow/flaky. Run manually if needed.")
-def test_run_screener_example_flow():
+@pytest.mark.serial
+def test_run_screener_example_flow(oneinch_http):
     TARGET_CHAIN_ID = ETHEREUM_CHAIN_ID 
     QUOTE_TOKEN_ADDRESS = USDC_ADDRESSES[ETHEREUM_CHAIN_ID]
-    # Supported seconds for OHLCV: 300 ,900 ,3600 ,14400 ,86400 ,604800
+    # Periods must have a Portfolio API v2 granularity in PERIOD_TO_GRANULARITY
     SCREENER_PERIODS_SECONDS = [PERIOD_DAILY_SECONDS, 14400] 
     MAX_TOKENS_TO_SCREEN = 2 # Reduced for test brevity
 
     logger.info(f"--- Starting Screener Example Flow for Chain ID {TARGET_CHAIN_ID} ---")
 
-    # 1. Fetch a list of "popular" tokens (using whitelisted as proxy)
-    logger.info(f"Fetching whitelisted tokens for chain {TARGET_CHAIN_ID}...")
-    try:
-        all_popular_tokens = fetch_1inch_whitelisted_tokens(chain_id_filter=TARGET_CHAIN_ID)
-    except OneInchAPIError as e:
-        pytest.fail(f"Failed to get popular tokens for screener due to API error: {e}")
-        return
-        
-    assert all_popular_tokens is not None, "Token list fetch returned None."
-    if not all_popular_tokens:
-        logger.warning(f"No whitelisted tokens found for chain {TARGET_CHAIN_ID}. Screener test cannot proceed fully.")
-        # Depending on strictness, you might want to pytest.skip or pass here.
-        # For now, let it proceed to see if it handles empty list gracefully.
-
-    tokens_to_screen = all_popular_tokens[:MAX_TOKENS_TO_SCREEN]
-    if not tokens_to_screen:
-        logger.info("No tokens selected to screen (either MAX_TOKENS_TO_SCREEN is 0 or no tokens were fetched).")
-    else:
-        logger.info(f"Selected {len(tokens_to_screen)} tokens to screen: {[t['symbol'] for t in tokens_to_screen]}")
-
     screener_results = {}
 
-    # 2. For each token, get OHLCV data for specified periods
-    for token_info in tokens_to_screen:
-        token_address = token_info['address']
-        token_symbol = token_info['symbol']
-        logger.info(f"Processing token: {token_symbol} ({token_address})")
-        screener_results[token_symbol] = {'address': token_address, 'name': token_info['name'], 'ohlcv_data': {}}
-
-        for period_seconds in SCREENER_PERIODS_SECONDS:
-            period_desc = f"{period_seconds // 3600}h" if period_seconds < PERIOD_DAILY_SECONDS else f"{period_seconds // PERIOD_DAILY_SECONDS}d"
-            logger.info(f"  Fetching {period_desc} OHLCV against {QUOTE_TOKEN_ADDRESS[:6]}...")
-            
-            if token_address.lower() == QUOTE_TOKEN_ADDRESS.lower():
-                logger.info(f"  Skipping OHLCV for {token_symbol} vs itself.")
-                screener_results[token_symbol]['ohlcv_data'][period_seconds] = "Self-pair"
-                continue
-            
+    def describe_period(period_seconds: int) -> str:
+        return f"{period_seconds // 3600}h" if period_seconds < PERIOD_DAILY_SECONDS else f"{period_seconds // PERIOD_DAILY_SECONDS}d"
+
+    async def screen(client):
+        # 1. Fetch a list of "popular" tokens (using whitelisted as proxy)
+        logger.info(f"Fetching whitelisted tokens for chain {TARGET_CHAIN_ID}...")
+        try:
+            all_popular_tokens = await fetch_1inch_whitelisted_tokens(chain_id_filter=TARGET_CHAIN_ID)
+        except OneInchAPIError as e:
+            pytest.fail(f"Failed to get popular tokens for screener due to API error: {e}")
+
+        assert all_popular_tokens is not None, "Token list fetch returned None."
+        if not all_popular_tokens:
+            logger.warning(f"No whitelisted tokens found for chain {TARGET_CHAIN_ID}. Screener test cannot proceed fully.")
+            # Depending on strictness, you might want to pytest.skip or pass here.
+            # For now, let it proceed to see if it handles empty list gracefully.
+
+        tokens_to_screen = all_popular_tokens[:MAX_TOKENS_TO_SCREEN]
+        if not tokens_to_screen:
+            logger.info("No tokens selected to screen (either MAX_TOKENS_TO_SCREEN is 0 or no tokens were fetched).")
+        else:
+            logger.info(f"Selected {len(tokens_to_screen)} tokens to screen: {[t['symbol'] for t in tokens_to_screen]}")
+
+        # 2. Collect every (token, period) pair to fetch, skipping self-pairs
+        pairs_to_fetch = []
+        for token_info in tokens_to_screen:
+            token_address = token_info['address']
+            token_symbol = token_info['symbol']
+            screener_results[token_symbol] = {'address': token_address, 'name': token_info['name'], 'ohlcv_data': {}}
+            for period_seconds in SCREENER_PERIODS_SECONDS:
+                if token_address.lower() == QUOTE_TOKEN_ADDRESS.lower():
+                    logger.info(f"  Skipping {describe_period(period_seconds)} OHLCV for {token_symbol} vs itself.")
+                    screener_results[token_symbol]['ohlcv_data'][period_seconds] = "Self-pair"
+                    continue
+                pairs_to_fetch.append((token_symbol, token_address, period_seconds))
+
+        # 3. Fetch all pairs concurrently (at most MAX_CONCURRENT_REQUESTS in flight) instead of one call and a sleep at a time
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+        async def fetch(token_address: str, period_seconds: int):
+            async with semaphore:
+                return await get_ohlcv_data(token_address, QUOTE_TOKEN_ADDRESS, PERIOD_TO_GRANULARITY[period_seconds], TARGET_CHAIN_ID)
+
+        logger.info(f"Fetching {len(pairs_to_fetch)} OHLCV series against {QUOTE_TOKEN_ADDRESS[:6]} concurrently...")
+        fetched = await asyncio.gather(
+            *(fetch(token_address, period_seconds) for _, token_address, period_seconds in pairs_to_fetch),
+            return_exceptions=True
+        )
+        return pairs_to_fetch, fetched
+
+    pairs_to_fetch, fetched = oneinch_http.run(screen)
+
+    # Portfolio API v2 returns a bare price-point list, the same shape as the cross-prices endpoint
+    for (token_symbol, _, period_seconds), ohlcv_data in zip(pairs_to_fetch, fetched):
+        period_desc = describe_period(period_seconds)
+        if isinstance(ohlcv_data, OneInchAPIError):
+            logger.error(f"  API Error fetching OHLCV for {token_symbol} {period_desc}: {ohlcv_data}")
+            ohlcv_data = None
+        elif isinstance(ohlcv_data, BaseException):
+            logger.error(f"  Unexpected error fetching OHLCV for {token_symbol} {period_desc}: {ohlcv_data}")
             ohlcv_data = None
+
+        if ohlcv_data and isinstance(ohlcv_data, list):
             try:
-                ohlcv_data = get_ohlcv_data(token_address, QUOTE_TOKEN_ADDRESS, period_seconds, TARGET_CHAIN_ID)
-            except OneInchAPIError as e:
-                logger.error(f"  API Error fetching OHLCV for {token_symbol} {period_desc}: {e}")
-            except Exception as e:
-                 logger.error(f"  Unexpected error fetching OHLCV for {token_symbol} {period_desc}: {e}")
-
-            if ohlcv_data and 'data' in ohlcv_data and ohlcv_data['data']:
-                try:
-                    validate_ohlcv_response_structure(ohlcv_data, f"{token_symbol} {period_desc}")
-                    screener_results[token_symbol]['ohlcv_data'][period_seconds] = ohlcv_data['data']
-                    logger.info(f"  Successfully fetched {len(ohlcv_data['data'])} candles for {period_desc}.")
-                except AssertionError as e:
-                    logger.warning(f"  OHLCV data validation failed for {token_symbol} {period_desc}: {e}")
-                    screener_results[token_symbol]['ohlcv_data'][period_seconds] = "Validation failed"
-            else:
-                logger.warning(f"  No OHLCV data or invalid response for {token_symbol} {period_desc}. Data: {str(ohlcv_data)[:100]}")
-                screener_results[token_symbol]['ohlcv_data'][period_seconds] = "No data/Error"
-            
-            time.sleep(0.75) # API Rate Limiting
+                validate_cross_prices_response_structure(ohlcv_data, f"{token_symbol} {period_desc}")
+                screener_results[token_symbol]['ohlcv_data'][period_seconds] = ohlcv_data
+                logger.info(f"  Successfully fetched {len(ohlcv_data)} candles for {token_symbol} {period_desc}.")
+            except AssertionError as e:
+                logger.warning(f"  OHLCV data validation failed for {token_symbol} {period_desc}: {e}")
+                screener_results[token_symbol]['ohlcv_data'][period_seconds] = "Validation failed"
+        else:
+            logger.warning(f"  No OHLCV data or invalid response for {token_symbol} {period_desc}. Data: {str(ohlcv_data)[:100]}")
+            screener_results[token_symbol]['ohlcv_data'][period_seconds] = "No data/Error"
 
     logger.info("--- Screener Example Flow Completed ---")
     logger.info(f"Screener Results (summary):")
@@ -365,9 +557,3 @@ def test_run_screener_example_flow():
                 logger.info(f"  Period {period}s: {status}")
         else:
             logger.info("  No OHLCV data found in results.")
-
-@pytest.fixture(scope="function", autouse=True)
-def test_case_delay():
-    yield
-    logger.debug("Delaying 1s after test case.")
-    time.sleep(1.0)
\ No newline at end of file